@@ -0,0 +1,167 @@
+import os
+import re
+import copy
+import queue
+import random
+import threading
+
+import numpy as np
+import torch
+
+from stable_baselines3.common.callbacks import BaseCallback
+
+
+CHECKPOINT_NAME = re.compile(r'^ckpt_(\d+)\.pt$')
+RUN_NAME = re.compile(r'^run_(\d+)$')
+
+
+def snapshot(model):
+    # everything is copied here, on the training thread, so training can go on
+    # while the copy is written; taken at the start of a rollout, when the last
+    # update is done and the rollout buffer holds nothing worth keeping
+    return {
+        'policy': {key: value.detach().clone() for key, value in model.policy.state_dict().items()},
+        'optimizer': copy.deepcopy(model.policy.optimizer.state_dict()),
+        'num_timesteps': model.num_timesteps,
+        'n_updates': model._n_updates,
+        'episode_num': model._episode_num,
+        'last_obs': copy.deepcopy(model._last_obs),
+        'last_episode_starts': copy.deepcopy(model._last_episode_starts),
+        'ep_info_buffer': copy.deepcopy(model.ep_info_buffer),
+        'ep_success_buffer': copy.deepcopy(model.ep_success_buffer),
+        'env': model.get_env().get_state(),
+        'random': random.getstate(),
+        'numpy': np.random.get_state(),
+        'torch': torch.get_rng_state(),
+    }
+
+
+def restore(model, state):
+    model.policy.load_state_dict(state['policy'])
+    model.policy.optimizer.load_state_dict(state['optimizer'])
+    model.num_timesteps = state['num_timesteps']
+    model._n_updates = state['n_updates']
+    model._episode_num = state['episode_num']
+    model._last_obs = state['last_obs']
+    model._last_episode_starts = state['last_episode_starts']
+    model.ep_info_buffer = state['ep_info_buffer']
+    model.ep_success_buffer = state['ep_success_buffer']
+    model.get_env().set_state(state['env'])
+    random.setstate(state['random'])
+    np.random.set_state(state['numpy'])
+    torch.set_rng_state(state['torch'])
+
+
+def list_checkpoints(save_path):
+    if not os.path.isdir(save_path):
+        return []
+    checkpoints = []
+    for name in os.listdir(save_path):
+        match = CHECKPOINT_NAME.match(name)
+        if match:
+            checkpoints.append((int(match.group(1)), os.path.join(save_path, name)))
+    return [path for (_, path) in sorted(checkpoints)]
+
+
+def latest_checkpoint(save_path):
+    checkpoints = list_checkpoints(save_path)
+    if checkpoints == []:
+        return None
+    return checkpoints[-1]
+
+
+def list_runs(save_path):
+    # every training run writes its checkpoints to its own run_NNN folder
+    if not os.path.isdir(save_path):
+        return []
+    runs = []
+    for name in os.listdir(save_path):
+        match = RUN_NAME.match(name)
+        if match:
+            runs.append((int(match.group(1)), os.path.join(save_path, name)))
+    return [path for (_, path) in sorted(runs)]
+
+
+def latest_run(save_path):
+    # the newest run with a checkpoint; a run that crashed before its first
+    # save leaves an empty folder that must not hide the runs before it
+    for run_path in reversed(list_runs(save_path)):
+        checkpoint = latest_checkpoint(run_path)
+        if checkpoint is not None:
+            return run_path, checkpoint
+    return None, None
+
+
+def new_run(save_path):
+    runs = list_runs(save_path)
+    number = 0
+    if runs != []:
+        number = int(RUN_NAME.match(os.path.basename(runs[-1])).group(1)) + 1
+    path = os.path.join(save_path, 'run_%03i' % number)
+    os.makedirs(path)
+    return path
+
+
+def load_checkpoint(model, path):
+    restore(model, torch.load(path, weights_only=False))
+
+
+class AsyncCheckpointCallback(BaseCallback):
+    def __init__(self, save_freq, save_path='checkpoints', keep=3, verbose=0):
+        super().__init__(verbose)
+        if keep < 1:
+            raise ValueError('keep must be at least 1, got %i' % keep)
+        self.save_freq = save_freq
+        self.save_path = save_path
+        self.keep = keep
+
+        self.last_save = 0
+        self.snapshots = queue.Queue()
+        self.thread = None
+        self.errors = queue.Queue()
+
+    def _init_callback(self):
+        os.makedirs(self.save_path, exist_ok=True)
+        self.last_save = self.model.num_timesteps
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._write, daemon=True)
+            self.thread.start()
+
+    def _on_rollout_start(self):
+        self._report_errors()
+        if self.model.num_timesteps - self.last_save >= self.save_freq:
+            self.last_save = self.model.num_timesteps
+            self.snapshots.put(snapshot(self.model))
+
+    def _on_step(self):
+        return True
+
+    def _on_training_end(self):
+        self.snapshots.join()
+        self._report_errors()
+
+    def _report_errors(self):
+        # a failed write costs only that checkpoint, training goes on
+        while not self.errors.empty():
+            (path, e) = self.errors.get()
+            print('Checkpoint %s failed: %r' % (path, e))
+
+    def _write(self):
+        while True:
+            state = self.snapshots.get()
+            path = os.path.join(self.save_path, 'ckpt_%i.pt' % state['num_timesteps'])
+            try:
+                # a crash while writing leaves only the .tmp file behind, never a broken checkpoint
+                torch.save(state, path + '.tmp')
+                os.replace(path + '.tmp', path)
+                if self.verbose > 0:
+                    print('Saved checkpoint %s' % path)
+
+                # the checkpoint just written is always kept, whatever the others are named
+                older = [old for old in list_checkpoints(self.save_path) if old != path]
+                for old in older[:max(0, len(older) - (self.keep - 1))]:
+                    os.remove(old)
+            except Exception as e:
+                self.errors.put((path, e))
+            finally:
+                self.snapshots.task_done()
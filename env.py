@@ -1,5 +1,5 @@
+import copy
 import pygame
-import random
 
 import numpy as np
 import gymnasium as gym
@@ -23,8 +23,33 @@ BLACK_PRE    = (128, 128, 128)
 WHITE_VIA    = (  0, 255,   0)
 BLACK_VIA    = (  0,   0, 255)
 
+# positions are stored as one byte per square
+POSITION_PIECES = [('empty', False), ('white', False), ('black', False), ('white', True), ('black', True)]
+POSITION_CODES = {piece: code for code, piece in enumerate(POSITION_PIECES)}
+
+
+_board_surface = None
+
+
+def board_surface():
+    # the empty checkerboard never changes, so it is drawn only once
+    global _board_surface
+    if _board_surface is None:
+        _board_surface = pygame.Surface((BOARD_SIZE * SQUARE_SIZE, BOARD_SIZE * SQUARE_SIZE))
+        _board_surface.fill(DARKBROWN)
+        for row in range(BOARD_SIZE):
+            for col in range(row % 2, BOARD_SIZE, 2):
+                pygame.draw.rect(_board_surface, LIGHTBROWN, (col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
+    return _board_surface
+
+
+def surface_array(surf):
+    return np.transpose(pygame.surfarray.array3d(surf), axes=(1, 0, 2))
+
 
 class Piece:
+    __slots__ = ('row', 'col', 'color', 'king')
+
     def __init__(self, row, col, color):
         self.row = row
         self.col = col
@@ -42,11 +67,50 @@ class Piece:
             pygame.draw.circle(surf, KING, [self.col * SQUARE_SIZE + SQUARE_SIZE // 2, self.row * SQUARE_SIZE + SQUARE_SIZE // 2], KING_SIZE)
 
 
+# the seed given to reset (or to a vec env) also seeds the env's np_random, so the
+# board's opponent and a vec env's draws use child seeds of it, never the same stream
+BOARD_STREAM = 0
+VEC_STREAM = 1
+
+
+def child_seed(seed, stream):
+    if seed is None:
+        return None
+    return np.random.SeedSequence(seed, spawn_key=(stream,))
+
+
+class RandomStream:
+    def __init__(self, seed=None, block=4096):
+        self.block = block
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        self.generator = np.random.default_rng(seed)
+        self.values = np.empty(0)
+        self.index = 0
+
+    def random(self):
+        # numbers are drawn from the generator a block at a time,
+        # a single numpy call per draw would cost more than the draw itself
+        if self.index == len(self.values):
+            self.values = self.generator.random(self.block)
+            self.index = 0
+        value = self.values[self.index]
+        self.index += 1
+        return value
+
+
 class Board:
-    def __init__(self):
+    def __init__(self, seed=None, block=4096):
         
         self.turn = 'black'
 
+        # opponent randomness, draw can be set from outside (e.g. by a vectorized
+        # env drawing for all its boards at once) to be used for the next choice;
+        # block is how many numbers are drawn ahead, a small one keeps idle boards small
+        self.rng = RandomStream(seed, block)
+        self.draw = None
+
         self.white_pieces = 12
         self.black_pieces = 12
 
@@ -68,6 +132,131 @@ class Board:
         self.last_white_move = None
         self.last_black_move = None
 
+        (reward, moved) = self._make_white_move(action)
+
+        if moved:
+            if self.black_pieces == 0:
+                end_game = True
+                winner = 'white'
+                reward = +100.0
+
+            # make black move (if not end game)
+            if self.end_game == False:
+                self.turn = 'black'
+
+                self._find_valid_moves()
+                if self.jumps != []:
+                    reward += self._make_black_move(self._choose_jump())
+                elif self.moves != []:
+                    reward += self._make_black_move(self._choose(len(self.moves)))
+
+                # check end game
+                if self.white_pieces == 0:
+                    end_game = True
+                    winner = 'black'
+                    reward = -100.0
+                if self.moves == [] and self.jumps == []:
+                    end_game = True
+                    winner = 'white'
+                    reward = +100.0
+
+        # fill state (observations)
+        state = [[[0 for _ in range(8)] for _ in range(8)] for _ in range(4)]
+        if end_game == False:
+            self.turn = 'white'
+
+            # first observation layer is white positions
+            for row in range(BOARD_SIZE):
+                for col in range(BOARD_SIZE):
+                    if self.pieces[row][col].color == 'white':
+                        state[0][row][col] = 1
+
+            # first observation layer is black positions
+            for row in range(BOARD_SIZE):
+                for col in range(BOARD_SIZE):
+                    if self.pieces[row][col].color == 'black':
+                        state[1][row][col] = 1
+
+            # third observation layer is empty positions
+            for row in range(BOARD_SIZE):
+                for col in range(BOARD_SIZE):
+                    if self.pieces[row][col].color == 'empty':
+                        state[2][row][col] = 1
+
+            self._find_valid_moves()
+            if self.jumps != []:
+                self.step_jump = True
+                for (_, _, _, _, new_row, new_col, _) in self.jumps:
+                    state[3][new_row][new_col] = 1
+            elif self.moves != []:
+                self.step_move = True
+                for (_, _, new_row, new_col) in self.moves:
+                    state[3][new_row][new_col] = 1
+
+            if self.moves == [] and self.jumps == []:
+                end_game = True
+                winner = 'black'
+                reward = -100
+
+        # a draw meant for this step's opponent move never carries over to a later choice
+        self.draw = None
+
+        return state, reward, end_game, winner
+
+    def reset_play(self):
+        # start position with black to move, for a player taking the opponent's side
+        self.end_game = False
+
+        self.white_pieces = 12
+        self.black_pieces = 12
+
+        self.pieces = [[], [], [], [], [], [], [], []]
+        self._setup()
+
+        self.last_white_move = None
+        self.last_black_move = None
+        self.step_move = False
+        self.step_jump = False
+
+        self.turn = 'black'
+        self._find_valid_moves()
+
+    def black_choices(self):
+        if self.jumps != []:
+            return [sel for sel in range(len(self.jumps)) if self.jumps[sel][6] == False]
+        return list(range(len(self.moves)))
+
+    def play_black(self, sel):
+        self.last_white_move = None
+        self.last_black_move = None
+
+        self._make_black_move(sel)
+        if self.white_pieces == 0:
+            return None, True, 'black'
+
+        state = self._start_white_turn()
+        if self.moves == [] and self.jumps == []:
+            return state, True, 'black'
+        return state, False, None
+
+    def play_white(self, action):
+        (_, moved) = self._make_white_move(action)
+        if moved == False:
+            # the policy rated every legal square 0, take any legal move instead of passing
+            self.step_jump = self.jumps != []
+            self.step_move = self.jumps == [] and self.moves != []
+            self._make_white_move([[1.0 for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)])
+
+        if self.black_pieces == 0:
+            return True, 'white'
+
+        self.turn = 'black'
+        self._find_valid_moves()
+        if self.moves == [] and self.jumps == []:
+            return True, 'white'
+        return False, None
+
+    def _make_white_move(self, action):
         reward = 0.0
 
         # action has 64 float evaluation values to be used to get the best move
@@ -131,108 +320,44 @@ class Board:
                     else:
                         jump_done = False
             self._promote(promote_row, promote_col)
-            reward += 2.0
+            reward = 2.0
         elif self.moves != []:
             for (old_row, old_col, new_row, new_col) in self.moves:
                 if best[1] == old_row and best[2] == old_col and best[3] == new_row and best[4] == new_col:
                     self._make_move(old_row, old_col, new_row, new_col)
                     self._promote(new_row, new_col)
-                    reward += 1.0
+                    reward = 1.0
                     self.last_white_move = (old_col, old_row, -1, -1, new_col, new_row)
 
         self.step_jump = False
         self.step_move = False
 
-        if best[1] != -1:
-            if self.black_pieces == 0:
-                end_game = True
-                winner = 'white'
-                reward = +100.0
-
-            # make black move (if not end game)
-            if self.end_game == False:
-                self.turn = 'black'
-
-                self._find_valid_moves()
-                if self.jumps != []:
-                    sel = -1
-                    while True:
-                        sel = random.randint(0, len(self.jumps) - 1)
-                        if self.jumps[sel][6] == False:
-                            break
-                    assert sel != -1
-                    self._make_jump(self.jumps[sel][0], self.jumps[sel][1], self.jumps[sel][2], self.jumps[sel][3], self.jumps[sel][4], self.jumps[sel][5])
-                    self.white_pieces -= 1
-                    self.last_black_move = (self.jumps[sel][1], self.jumps[sel][0], self.jumps[sel][3], self.jumps[sel][2], self.jumps[sel][5], self.jumps[sel][4])
-                    while True:
-                        if sel < len(self.jumps) - 1:
-                            sel += 1
-                            if self.jumps[sel][6] == True:
-                                self._make_jump(self.jumps[sel][0], self.jumps[sel][1], self.jumps[sel][2], self.jumps[sel][3], self.jumps[sel][4], self.jumps[sel][5])
-                                self.white_pieces -= 1
-                                self.last_black_move = (self.jumps[sel][1], self.jumps[sel][0], self.jumps[sel][3], self.jumps[sel][2], self.jumps[sel][5], self.jumps[sel][4])
-                            else:
-                                break
-                        else:
-                            break
-                    self._promote(self.jumps[sel][4], self.jumps[sel][5])
-                    reward -= 2
-                elif self.moves != []:
-                    sel = random.randint(0, len(self.moves)-1)
-                    self._make_move(self.moves[sel][0], self.moves[sel][1], self.moves[sel][2], self.moves[sel][3])
-                    self._promote(self.moves[sel][2], self.moves[sel][3])
-                    reward -= 1
-                    self.last_black_move = (self.moves[sel][1], self.moves[sel][0], -1, -1, self.moves[sel][3], self.moves[sel][2])
-
-                # check end game
-                if self.white_pieces == 0:
-                    end_game = True
-                    winner = 'black'
-                    reward = -100.0
-                if self.moves == [] and self.jumps == []:
-                    end_game = True
-                    winner = 'white'
-                    reward = +100.0
-
-        # fill state (observations)
-        state = [[[0 for _ in range(8)] for _ in range(8)] for _ in range(4)]
-        if end_game == False:
-            self.turn = 'white'
+        return reward, best[1] != -1
 
-            # first observation layer is white positions
-            for row in range(BOARD_SIZE):
-                for col in range(BOARD_SIZE):
-                    if self.pieces[row][col].color == 'white':
-                        state[0][row][col] = 1
-
-            # first observation layer is black positions
-            for row in range(BOARD_SIZE):
-                for col in range(BOARD_SIZE):
-                    if self.pieces[row][col].color == 'black':
-                        state[1][row][col] = 1
-
-            # third observation layer is empty positions
-            for row in range(BOARD_SIZE):
-                for col in range(BOARD_SIZE):
-                    if self.pieces[row][col].color == 'empty':
-                        state[2][row][col] = 1
-
-            self._find_valid_moves()
-            if self.jumps != []:
-                self.step_jump = True
-                for (_, _, _, _, new_row, new_col, _) in self.jumps:
-                    state[3][new_row][new_col] = 1
-            elif self.moves != []:
-                self.step_move = True
-                for (_, _, new_row, new_col) in self.moves:
-                    state[3][new_row][new_col] = 1
-
-            if self.moves == [] and self.jumps == []:
-                end_game = True
-                winner = 'black'
-                reward = -100
-
-        return state, reward, end_game, winner
+    def _make_black_move(self, sel):
+        # sel is a jump starting a sequence (linked jumps follow it) or a move
+        if self.jumps != []:
+            self._make_jump(self.jumps[sel][0], self.jumps[sel][1], self.jumps[sel][2], self.jumps[sel][3], self.jumps[sel][4], self.jumps[sel][5])
+            self.white_pieces -= 1
+            self.last_black_move = (self.jumps[sel][1], self.jumps[sel][0], self.jumps[sel][3], self.jumps[sel][2], self.jumps[sel][5], self.jumps[sel][4])
+            while True:
+                if sel < len(self.jumps) - 1:
+                    sel += 1
+                    if self.jumps[sel][6] == True:
+                        self._make_jump(self.jumps[sel][0], self.jumps[sel][1], self.jumps[sel][2], self.jumps[sel][3], self.jumps[sel][4], self.jumps[sel][5])
+                        self.white_pieces -= 1
+                        self.last_black_move = (self.jumps[sel][1], self.jumps[sel][0], self.jumps[sel][3], self.jumps[sel][2], self.jumps[sel][5], self.jumps[sel][4])
+                    else:
+                        break
+                else:
+                    break
+            self._promote(self.jumps[sel][4], self.jumps[sel][5])
+            return -2.0
+        else:
+            self._make_move(self.moves[sel][0], self.moves[sel][1], self.moves[sel][2], self.moves[sel][3])
+            self._promote(self.moves[sel][2], self.moves[sel][3])
+            self.last_black_move = (self.moves[sel][1], self.moves[sel][0], -1, -1, self.moves[sel][3], self.moves[sel][2])
+            return -1.0
 
     def reset(self):
         self.end_game = False
@@ -247,7 +372,7 @@ class Board:
         self.turn = 'black'
         self._find_valid_moves()
         if self.jumps != []:
-            sel = random.randint(0, len(self.jumps) - 1)
+            sel = self._choose_jump()
             self._make_jump(self.jumps[sel][0], self.jumps[sel][1], self.jumps[sel][2], self.jumps[sel][3], self.jumps[sel][4], self.jumps[sel][5])
             self.white_pieces -= 1
             while True:
@@ -262,10 +387,34 @@ class Board:
                     break
             self._promote(self.jumps[sel][4], self.jumps[sel][5])
         elif self.moves != []:
-            sel = random.randint(0, len(self.moves)-1)
+            sel = self._choose(len(self.moves))
             self._make_move(self.moves[sel][0], self.moves[sel][1], self.moves[sel][2], self.moves[sel][3])
             self._promote(self.moves[sel][2], self.moves[sel][3])
 
+        return self._start_white_turn()
+
+    def get_position(self):
+        return bytes(POSITION_CODES[(piece.color, piece.king == True)] for row in self.pieces for piece in row)
+
+    def load(self, position):
+        self.end_game = False
+
+        self.pieces = [[], [], [], [], [], [], [], []]
+        for row in range(BOARD_SIZE):
+            for col in range(BOARD_SIZE):
+                (color, king) = POSITION_PIECES[position[row * BOARD_SIZE + col]]
+                piece = Piece(row, col, color)
+                piece.king = king
+                self.pieces[row].append(piece)
+        self.white_pieces = sum(1 for row in self.pieces for piece in row if piece.color == 'white')
+        self.black_pieces = sum(1 for row in self.pieces for piece in row if piece.color == 'black')
+
+        self.last_white_move = None
+        self.last_black_move = None
+
+        return self._start_white_turn()
+
+    def _start_white_turn(self):
         self.moves = []
         self.step_move = False
         self.jumps = []
@@ -306,20 +455,33 @@ class Board:
         return state
 
     def render(self, surf):
-        surf.fill(DARKBROWN)
+        surf.blit(board_surface(), (0, 0))
+
+        for row in self.pieces:
+            for col in range(BOARD_SIZE):
+                row[col].render(surf)
+
+        self.render_overlay(surf)
+
+    def render_pieces(self, surf, drawn):
+        # only squares whose piece changed since the last call are redrawn,
+        # drawn holds the (color, king) last drawn on each square of surf
+        background = board_surface()
         for row in range(BOARD_SIZE):
-            for col in range(row % 2, BOARD_SIZE, 2):
-                pygame.draw.rect(surf, LIGHTBROWN, (col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
-        
+            for col in range(BOARD_SIZE):
+                piece = self.pieces[row][col]
+                if drawn[row][col] != (piece.color, piece.king):
+                    rect = (col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
+                    surf.blit(background, rect, rect)
+                    piece.render(surf)
+                    drawn[row][col] = (piece.color, piece.king)
+
+    def render_overlay(self, surf):
         for move in self.moves:
             pygame.draw.rect(surf, HILIGHT_MOVE, (move[3]*SQUARE_SIZE + 4, move[2]*SQUARE_SIZE + 4, SQUARE_SIZE - 8, SQUARE_SIZE - 8))
         for jump in self.jumps:
             pygame.draw.rect(surf, HILIGHT_JUMP, (jump[5]*SQUARE_SIZE + 4, jump[4]*SQUARE_SIZE + 4, SQUARE_SIZE - 8, SQUARE_SIZE - 8))
 
-        for row in self.pieces:
-            for col in range(BOARD_SIZE):
-                row[col].render(surf)
-
         if self.last_white_move is not None:
             if self.last_white_move[2] == -1:
                 pygame.draw.circle(surf, WHITE_PRE, [self.last_white_move[0]*SQUARE_SIZE + SQUARE_SIZE // 2, self.last_white_move[1]*SQUARE_SIZE + SQUARE_SIZE // 2], PIECE_SIZE)
@@ -343,12 +505,7 @@ class Board:
     def update(self):
         self._find_valid_moves()
         if self.jumps != []:
-            sel = -1
-            while True:
-                sel = random.randint(0, len(self.jumps) - 1)
-                if self.jumps[sel][6] == False:
-                    break
-            assert sel != -1
+            sel = self._choose_jump()
             self._make_jump(self.jumps[sel][0], self.jumps[sel][1], self.jumps[sel][2], self.jumps[sel][3], self.jumps[sel][4], self.jumps[sel][5])
             while True:
                 if sel < len(self.jumps) - 1:
@@ -365,7 +522,7 @@ class Board:
             else:
                 self.white_pieces -= 1
         elif self.moves != []:
-            sel = random.randint(0, len(self.moves)-1)
+            sel = self._choose(len(self.moves))
             self._make_move(self.moves[sel][0], self.moves[sel][1], self.moves[sel][2], self.moves[sel][3])
             self._promote(self.moves[sel][2], self.moves[sel][3])
 
@@ -395,6 +552,19 @@ class Board:
 
         return self.end_game, self.winner
 
+    def _choose(self, n):
+        if self.draw is not None:
+            value = self.draw
+            self.draw = None
+        else:
+            value = self.rng.random()
+        return min(int(value * n), n - 1)
+
+    def _choose_jump(self):
+        # only jumps starting a sequence can be chosen, linked jumps follow them
+        starts = [sel for sel in range(len(self.jumps)) if self.jumps[sel][6] == False]
+        return starts[self._choose(len(starts))]
+
     def _setup(self):
         for row in range(BOARD_SIZE):
             for col in range(BOARD_SIZE):
@@ -562,9 +732,9 @@ class Board:
 
 
 class CheckersEnv(gym.Env):
-    metadata = {"render_modes": ["human"] }
+    metadata = {"render_modes": ["human", "rgb_array"] }
 
-    def __init__(self, render_mode: Optional[str] = None, render_fps: Optional[int] = 60):
+    def __init__(self, render_mode: Optional[str] = None, render_fps: Optional[int] = 60, start_buffer=None, start_prob: float = 0.5, record_every: int = 8):
 
         self.action_space = gym.spaces.Box(low=0.0, high=1.0, shape=(BOARD_SIZE, BOARD_SIZE), dtype=np.float32)
         self.observation_space = gym.spaces.Box(low=0, high=1, shape=(4, BOARD_SIZE, BOARD_SIZE), dtype=np.uint8)
@@ -577,11 +747,23 @@ class CheckersEnv(gym.Env):
 
         self.screen = None
         self.clock = None
+        self.font = None
+        self.surf_board = None
+        self.surf_info = None
+        self.drawn = None
 
         # checkers board
 
         self.board = Board()
 
+        # start state replay, every record_every steps the position is kept and
+        # at the end of the episode handed to the buffer with the game outcome
+
+        self.start_buffer = start_buffer
+        self.start_prob = start_prob
+        self.record_every = record_every
+        self.trajectory = []
+
         self.episodes = -1
         self.steps = 0
         self.reward = 0.0
@@ -596,6 +778,8 @@ class CheckersEnv(gym.Env):
 
         if terminated == False:
             self.steps += 1
+            if self.start_buffer is not None and self.steps % self.record_every == 0:
+                self.trajectory.append(self.board.get_position())
             if self.steps == 1024:
                 terminated = True
         else:
@@ -604,11 +788,43 @@ class CheckersEnv(gym.Env):
             elif winner == 'black':
                 self.black_wins += 1
 
+        if terminated and self.start_buffer is not None:
+            self.start_buffer.add_episode(self.trajectory, winner)
+            self.trajectory = []
+
         self.reward += reward
-        self.render()
+        if self.render_mode == "human":
+            self.render()
 
         return state, reward, terminated, False, {}
 
+    def get_state(self):
+        return {
+            "board": copy.deepcopy(self.board),
+            "np_random": self.np_random.bit_generator.state,
+            "episodes": self.episodes,
+            "steps": self.steps,
+            "reward": self.reward,
+            "score": self.score,
+            "white_wins": self.white_wins,
+            "black_wins": self.black_wins,
+            "trajectory": list(self.trajectory),
+            "start_buffer": None if self.start_buffer is None else self.start_buffer.get_state(),
+        }
+
+    def set_state(self, state):
+        self.board = copy.deepcopy(state["board"])
+        self.np_random.bit_generator.state = state["np_random"]
+        self.episodes = state["episodes"]
+        self.steps = state["steps"]
+        self.reward = state["reward"]
+        self.score = state["score"]
+        self.white_wins = state["white_wins"]
+        self.black_wins = state["black_wins"]
+        self.trajectory = list(state["trajectory"])
+        if self.start_buffer is not None:
+            self.start_buffer.set_state(state["start_buffer"])
+
     def close(self):
         if self.screen is not None:
             pygame.display.quit()
@@ -616,25 +832,55 @@ class CheckersEnv(gym.Env):
 
     def reset(self, *, seed: Optional[int] = None, options: Optional[dict] = None):
         super().reset(seed=seed)
+        if seed is not None:
+            self.board.rng.seed(child_seed(seed, BOARD_STREAM))
 
         self.episodes += 1
         self.steps = 0
         if self.episodes > 0:
             self.score = max(self.score, self.reward)
         self.reward = 0.0
+        self.trajectory = []
+
+        info = {}
+        if options is not None and "start_state" in options:
+            state = self.board.load(options["start_state"])
+        elif self.start_buffer is not None and len(self.start_buffer) > 0 and self.np_random.random() < self.start_prob:
+            index, generation, position = self.start_buffer.sample(self.np_random)
+            state = self.board.load(position)
+            info["start_index"] = index
+            info["start_generation"] = generation
+        else:
+            state = self.board.reset()
 
-        state = self.board.reset()
-
-        self.render()
+        if self.render_mode == "human":
+            self.render()
 
-        return state, {}
+        return state, info
 
     def render(self):
         if self.render_mode == "human":
             self._render_frame()
+        elif self.render_mode == "rgb_array":
+            return self._render_rgb_array()
+
+    def render_surface(self):
+        # a new Surface holding the rgb_array frame, it is not touched again by the
+        # env, so turning it into pixels can be left to another thread
+        if self.surf_board is None:
+            self.surf_board = board_surface().copy()
+            self.drawn = [[None for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+
+        self.board.render_pieces(self.surf_board, self.drawn)
+        frame = self.surf_board.copy()
+        self.board.render_overlay(frame)
+
+        return frame
+
+    def _render_rgb_array(self):
+        return surface_array(self.render_surface())
 
     def _render_frame(self):
-        pygame.font.init()
         if self.screen is None:
             pygame.init()
             pygame.display.init()
@@ -642,14 +888,19 @@ class CheckersEnv(gym.Env):
             self.screen = pygame.display.set_mode((800, 800))
         if self.clock is None:
             self.clock = pygame.time.Clock()
-
-        surf_board = pygame.Surface((640, 640))
-        surf_info = pygame.Surface((640, 40))
+        if self.font is None:
+            pygame.font.init()
+            self.font = pygame.font.Font(pygame.font.get_default_font(), 12)
+            self.surf_board = pygame.Surface((640, 640))
+            self.surf_info = pygame.Surface((640, 40))
+
+        surf_board = self.surf_board
+        surf_info = self.surf_info
         surf_info.fill(DARKBROWN)
 
         self.board.render(surf_board)
         self.screen.blit(surf_board, (80, 80))
-        font = pygame.font.Font(pygame.font.get_default_font(), 12)
+        font = self.font
         
         text = font.render("Episodes: %04i" % self.episodes, True, LIGHTBROWN, DARKBROWN)
         text_rect = text.get_rect()
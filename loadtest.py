@@ -0,0 +1,67 @@
+import json
+import time
+import asyncio
+import argparse
+
+import numpy as np
+
+
+HOST = '127.0.0.1'
+PORT = 8765
+
+
+async def play(host, port, moves, latencies, human=False):
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def request(message):
+        writer.write(json.dumps(message).encode() + b'\n')
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        if 'error' in response:
+            raise RuntimeError(response['error'])
+        return response
+
+    # with human set, the client plays black with random choices
+    rng = np.random.default_rng()
+    response = await request({'op': 'new', 'play': human})
+    for _ in range(moves):
+        start = time.perf_counter()
+        if human:
+            choice = int(rng.integers(len(response['choices'])))
+            response = await request({'op': 'move', 'game': response['game'], 'choice': choice})
+        else:
+            response = await request({'op': 'step', 'game': response['game']})
+        latencies.append(time.perf_counter() - start)
+        if response['done']:
+            await request({'op': 'close', 'game': response['game']})
+            response = await request({'op': 'new', 'play': human})
+    await request({'op': 'close', 'game': response['game']})
+
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run(host, port, games, moves, human):
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*[play(host, port, moves, latencies, human) for _ in range(games)])
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1000.0
+    print('Games: %i Moves: %i Time: %.2fs Moves/s: %.1f' % (games, len(latencies), elapsed, len(latencies) / elapsed))
+    for p in [50, 90, 99]:
+        print('p%i: %.2f ms' % (p, np.percentile(latencies, p)))
+    print('max: %.2f ms' % latencies.max())
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--moves', type=int, default=100)
+    parser.add_argument('--play', action='store_true')
+    args = parser.parse_args()
+
+    asyncio.run(run(args.host, args.port, args.games, args.moves, args.play))
@@ -1,4 +1,5 @@
 import os
+import argparse
 import pygame
 import gymnasium as gym
 import numpy as np
@@ -8,17 +9,33 @@ import time
 from env import CheckersEnv
 from env import Board
 from env import Piece
+from vecenv import CheckersVecEnv
+from checkpoint import AsyncCheckpointCallback, latest_run, load_checkpoint, new_run
 
 from stable_baselines3 import PPO
 from stable_baselines3.common.vec_env import DummyVecEnv
 from stable_baselines3.common.evaluation import evaluate_policy
 
 
-def train():
+def train(resume=False):
     env = CheckersEnv(render_mode="human", render_fps=60)
-    env = DummyVecEnv([lambda:env])
-    model = PPO('MlpPolicy', env=env, verbose=1)
-    model.learn(total_timesteps=81920)
+    env = CheckersVecEnv([lambda:env])
+    model = PPO('MlpPolicy', env=env, verbose=1, seed=0)
+
+    checkpoint_path = os.path.join('models', 'checkpoints')
+    run_path = None
+    if resume:
+        run_path, checkpoint_file = latest_run(checkpoint_path)
+        if checkpoint_file is not None:
+            print('Resuming from %s' % checkpoint_file)
+            load_checkpoint(model, checkpoint_file)
+        else:
+            print('No checkpoint in %s, starting a new run' % checkpoint_path)
+    if run_path is None:
+        run_path = new_run(checkpoint_path)
+
+    checkpoint = AsyncCheckpointCallback(save_freq=8192, save_path=run_path)
+    model.learn(total_timesteps=81920 - model.num_timesteps, callback=checkpoint, reset_num_timesteps=False)
 
     model_file_name = 'ppo_model_checkers'
     ppo_path = os.path.join('models', model_file_name)
@@ -90,4 +107,8 @@ def debug():
 
 if __name__ == '__main__':
 
-    train()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--resume', action='store_true')
+    args = parser.parse_args()
+
+    train(resume=args.resume)
@@ -0,0 +1,107 @@
+import os
+import queue
+import threading
+import importlib.util
+
+import gymnasium as gym
+
+from env import surface_array
+
+# mp4 encoding needs both imageio and its ffmpeg plugin:
+# pip install imageio imageio-ffmpeg
+try:
+    import imageio
+except ImportError:
+    imageio = None
+HAS_FFMPEG = importlib.util.find_spec('imageio_ffmpeg') is not None
+
+
+class VideoRecorder(gym.Wrapper):
+    def __init__(self, env, video_folder='videos', every=100, fps=4, max_frames=64):
+        super().__init__(env)
+        assert env.render_mode == "rgb_array"
+        if imageio is None or not HAS_FFMPEG:
+            raise ImportError("VideoRecorder needs imageio and imageio-ffmpeg: pip install imageio imageio-ffmpeg")
+
+        self.video_folder = video_folder
+        self.every = every
+        self.fps = fps
+
+        self.episode = -1
+        self.recording = False
+        self.dropped = 0
+
+        # frames are handed to the encoder thread as Surfaces, the pixel conversion
+        # and encoding both happen there, so the training loop only pays for drawing;
+        # at most max_frames frames wait at once, when the encoder falls behind
+        # frames are dropped (and not even drawn) instead of piling up. The episode
+        # start and end markers don't count against that and never wait.
+        self.frames = queue.Queue()
+        self.slots = threading.Semaphore(max_frames)
+        self.thread = threading.Thread(target=self._encode, daemon=True)
+        self.thread.start()
+
+    def reset(self, **kwargs):
+        obs, info = self.env.reset(**kwargs)
+
+        if self.recording:
+            self.frames.put(None)
+        self.episode += 1
+        self.recording = self.episode % self.every == 0
+        if self.recording:
+            path = os.path.join(self.video_folder, 'episode_%06i.mp4' % self.episode)
+            self.frames.put(path)
+            self._put_frame()
+
+        return obs, info
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = self.env.step(action)
+
+        if self.recording:
+            self._put_frame()
+
+        return obs, reward, terminated, truncated, info
+
+    def close(self):
+        if self.recording:
+            self.frames.put(None)
+            self.recording = False
+        self.frames.join()
+        if self.dropped > 0:
+            print('VideoRecorder dropped %i frames' % self.dropped)
+        super().close()
+
+    def _put_frame(self):
+        if not self.slots.acquire(blocking=False):
+            self.dropped += 1
+            return
+        self.frames.put(self.env.unwrapped.render_surface())
+
+    def _encode(self):
+        writer = None
+        while True:
+            item = self.frames.get()
+            try:
+                if isinstance(item, str):
+                    os.makedirs(self.video_folder, exist_ok=True)
+                    writer = imageio.get_writer(item, fps=self.fps)
+                elif item is None:
+                    if writer is not None:
+                        writer.close()
+                    writer = None
+                else:
+                    self.slots.release()
+                    if writer is not None:
+                        writer.append_data(surface_array(item))
+            except Exception as e:
+                # the episode is given up, recording starts again with the next one
+                print('VideoRecorder failed: %r' % e)
+                if writer is not None:
+                    try:
+                        writer.close()
+                    except Exception:
+                        pass
+                writer = None
+            finally:
+                self.frames.task_done()
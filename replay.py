@@ -0,0 +1,114 @@
+import numpy as np
+
+
+WIN_PRIORITY = 0.1
+DRAW_PRIORITY = 0.5
+LOSS_PRIORITY = 1.0
+
+
+class SumTree:
+    def __init__(self, capacity):
+        # leaves are tree[capacity:], every inner node holds the sum of its two children
+        self.capacity = capacity
+        self.tree = np.zeros(2 * capacity, dtype=np.float64)
+
+    def total(self):
+        return self.tree[1]
+
+    def update(self, index, priority):
+        # parents are summed again from their children rather than shifted by
+        # the change, so rounding errors can't build up over many updates
+        node = index + self.capacity
+        self.tree[node] = priority
+        node //= 2
+        while node >= 1:
+            self.tree[node] = self.tree[2 * node] + self.tree[2 * node + 1]
+            node //= 2
+
+    def find(self, value):
+        node = 1
+        while node < self.capacity:
+            left = 2 * node
+            if value < self.tree[left]:
+                node = left
+            else:
+                value -= self.tree[left]
+                node = left + 1
+        return node - self.capacity
+
+
+class StartStateBuffer:
+    def __init__(self, capacity=65536, alpha=0.6):
+        self.capacity = capacity
+        self.alpha = alpha
+
+        self.tree = SumTree(capacity)
+        self.positions = [None] * capacity
+        self.next = 0
+        self.size = 0
+
+        # every add gets the next generation number, so a caller holding an index
+        # can tell whether the ring has overwritten that slot since
+        self.generations = [0] * capacity
+        self.added = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, position, priority):
+        # once full, the oldest position is overwritten
+        index = self.next
+        self.positions[index] = position
+        self.added += 1
+        self.generations[index] = self.added
+        self.tree.update(index, priority ** self.alpha)
+        self.next = (self.next + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return index
+
+    def add_episode(self, positions, winner):
+        if winner == 'white':
+            priority = WIN_PRIORITY
+        elif winner == 'black':
+            priority = LOSS_PRIORITY
+        else:
+            priority = DRAW_PRIORITY
+        for position in positions:
+            self.add(position, priority)
+
+    def update(self, index, priority, generation=None):
+        # returns False, changing nothing, when the slot holds a newer position
+        if index < 0 or index >= self.size:
+            raise IndexError('no position at index %i' % index)
+        if generation is not None and generation != self.generations[index]:
+            return False
+        self.tree.update(index, priority ** self.alpha)
+        return True
+
+    def sample(self, rng):
+        # rng is the sampling env's own generator, so resets stay reproducible
+        value = rng.random() * self.tree.total()
+        index = self.tree.find(value)
+        # rounding in the inner sums can walk past the last filled leaf
+        if index >= self.size:
+            index = self.size - 1
+        return index, self.generations[index], self.positions[index]
+
+    def get_state(self):
+        return {
+            'tree': self.tree.tree.copy(),
+            'positions': list(self.positions),
+            'next': self.next,
+            'size': self.size,
+            'generations': list(self.generations),
+            'added': self.added,
+        }
+
+    def set_state(self, state):
+        # restored in place, the buffer may be shared by several envs
+        self.tree.tree[:] = state['tree']
+        self.positions = list(state['positions'])
+        self.next = state['next']
+        self.size = state['size']
+        self.generations = list(state['generations'])
+        self.added = state['added']
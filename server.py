@@ -0,0 +1,234 @@
+import os
+import json
+import asyncio
+import argparse
+
+import numpy as np
+
+from env import Board
+
+from stable_baselines3 import PPO
+
+
+HOST = '127.0.0.1'
+PORT = 8765
+
+MAX_STEPS = 1024
+MAX_BATCH = 256
+MAX_WAIT = 0.002
+RNG_BLOCK = 64
+
+
+class Game:
+    __slots__ = ('board', 'play', 'state', 'steps', 'reward', 'done', 'winner')
+
+    def __init__(self, play=False):
+        # in play mode the client moves black, otherwise the board's random opponent does
+        self.board = Board(block=RNG_BLOCK)
+        self.play = play
+        if play:
+            self.board.reset_play()
+            self.state = None
+        else:
+            self.state = self.board.reset()
+        self.steps = 0
+        self.reward = 0.0
+        self.done = False
+        self.winner = None
+
+
+class PlayServer:
+    def __init__(self, model, max_batch=MAX_BATCH, max_wait=MAX_WAIT):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        self.games = {}
+        self.next_id = 0
+
+        # every pending step is one (game, future) entry; a game can only have
+        # one entry in flight, so the FIFO order is also a round robin over games
+        self.queue = None
+        self.batcher = None
+
+    async def start(self, host=HOST, port=PORT):
+        self.queue = asyncio.Queue()
+        self.batcher = asyncio.create_task(self._batch_loop())
+        return await asyncio.start_server(self._handle_client, host, port)
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                obs = np.array([game.state for (game, _) in batch], dtype=np.uint8)
+                actions = await loop.run_in_executor(None, self._predict, obs)
+                for (game, future), action in zip(batch, actions):
+                    if not future.done():
+                        future.set_result(self._advance(game, action))
+            except Exception as e:
+                print('Batch failed: %r' % e)
+                for (game, future) in batch:
+                    if not future.done():
+                        game.done = True
+                        future.set_exception(RuntimeError('move failed: %r' % e))
+
+    def _predict(self, obs):
+        actions, _ = self.model.predict(obs, deterministic=True)
+        return actions
+
+    def _advance(self, game, action):
+        if game.play:
+            return self._advance_play(game, action)
+
+        state, reward, terminated, winner = game.board.step(action)
+        game.steps += 1
+        game.reward += reward
+        if terminated == False and game.steps == MAX_STEPS:
+            terminated = True
+        game.state = state
+        game.done = terminated
+        game.winner = winner
+        return {
+            'state': state,
+            'reward': reward,
+            'done': terminated,
+            'winner': winner,
+            'white_move': game.board.last_white_move,
+            'black_move': game.board.last_black_move,
+        }
+
+    def _advance_play(self, game, action):
+        terminated, winner = game.board.play_white(action)
+        game.steps += 1
+        game.done = terminated
+        game.winner = winner
+        return self._play_response(game)
+
+    def _play_response(self, game):
+        return {
+            'position': list(game.board.get_position()),
+            'choices': [] if game.done else black_moves(game.board),
+            'done': game.done,
+            'winner': game.winner,
+            'white_move': game.board.last_white_move,
+            'black_move': game.board.last_black_move,
+        }
+
+    async def _handle_client(self, reader, writer):
+        owned = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    response = await self._dispatch(request, owned)
+                except (ValueError, KeyError, TypeError, RuntimeError) as e:
+                    response = {'error': str(e)}
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for game_id in owned:
+                self.games.pop(game_id, None)
+            writer.close()
+
+    async def _dispatch(self, request, owned):
+        if not isinstance(request, dict):
+            raise TypeError('request must be an object')
+        op = request['op']
+        if op == 'new':
+            game_id = self.next_id
+            self.next_id += 1
+            game = Game(play=request.get('play', False) == True)
+            self.games[game_id] = game
+            owned.add(game_id)
+            if game.play:
+                response = self._play_response(game)
+                response['game'] = game_id
+                return response
+            return {'game': game_id, 'state': game.state}
+        if op == 'step':
+            game = self._game(request, owned, play=False)
+            return await self._queue_move(game, request['game'])
+        if op == 'move':
+            # the client's black move, the agent's reply goes through the batcher
+            game = self._game(request, owned, play=True)
+            choice = request['choice']
+            choices = game.board.black_choices()
+            if not isinstance(choice, int) or choice < 0 or choice >= len(choices):
+                raise ValueError('invalid choice %r' % (choice,))
+            state, terminated, winner = game.board.play_black(choices[choice])
+            game.state = state
+            if terminated:
+                game.done = True
+                game.winner = winner
+                response = self._play_response(game)
+                response['game'] = request['game']
+                return response
+            return await self._queue_move(game, request['game'])
+        if op == 'close':
+            game_id = request['game']
+            owned.discard(game_id)
+            self.games.pop(game_id, None)
+            return {'game': game_id}
+        raise ValueError('unknown op %s' % op)
+
+    def _game(self, request, owned, play):
+        game_id = request['game']
+        if game_id not in owned:
+            raise KeyError('unknown game %s' % game_id)
+        game = self.games[game_id]
+        if game.play != play:
+            raise ValueError('game %s is %s' % (game_id, 'played' if game.play else 'watched'))
+        if game.done:
+            raise ValueError('game %s is over' % game_id)
+        return game
+
+    async def _queue_move(self, game, game_id):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((game, future))
+        response = await future
+        response['game'] = game_id
+        return response
+
+
+def black_moves(board):
+    if board.jumps != []:
+        return [[board.jumps[sel][0], board.jumps[sel][1], board.jumps[sel][4], board.jumps[sel][5]] for sel in board.black_choices()]
+    return [list(board.moves[sel]) for sel in board.black_choices()]
+
+
+async def serve(model_path, host=HOST, port=PORT, max_batch=MAX_BATCH, max_wait=MAX_WAIT):
+    model = PPO.load(model_path, device='cpu')
+    server = PlayServer(model, max_batch=max_batch, max_wait=max_wait)
+    tcp_server = await server.start(host, port)
+    print('Serving on %s:%i' % (host, port))
+    async with tcp_server:
+        await tcp_server.serve_forever()
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--model', default=os.path.join('models', 'ppo_model_checkers'))
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--max-batch', type=int, default=MAX_BATCH)
+    parser.add_argument('--max-wait', type=float, default=MAX_WAIT)
+    args = parser.parse_args()
+
+    asyncio.run(serve(args.model, args.host, args.port, args.max_batch, args.max_wait))
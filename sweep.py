@@ -0,0 +1,131 @@
+import os
+import json
+import math
+import random
+import argparse
+
+from concurrent.futures import ProcessPoolExecutor
+
+from env import CheckersEnv
+from vecenv import CheckersVecEnv
+
+from stable_baselines3 import PPO
+from stable_baselines3.common.evaluation import evaluate_policy
+
+
+SEARCH_SPACE = {
+    'learning_rate': [1e-4, 3e-4, 1e-3],
+    'n_steps': [512, 1024, 2048],
+    'batch_size': [64, 128, 256],
+    'n_epochs': [5, 10],
+    'gamma': [0.95, 0.99, 0.995],
+    'gae_lambda': [0.9, 0.95, 0.98],
+    'clip_range': [0.1, 0.2, 0.3],
+    'ent_coef': [0.0, 0.01],
+}
+
+# PPO always trains whole rollouts, budgets that are a multiple of every
+# n_steps choice give all trials of a rung the same number of timesteps
+ROLLOUT_MULTIPLE = math.lcm(*SEARCH_SPACE['n_steps'])
+
+EVAL_EPISODES = 20
+EVAL_SEED = 1234
+
+
+def sample_config(rng):
+    return {key: rng.choice(values) for key, values in SEARCH_SPACE.items()}
+
+
+def _init_worker():
+    # one process per trial already fills the cpus, torch threads would only fight over them
+    import torch
+    torch.set_num_threads(1)
+
+
+def run_trial(trial, config, timesteps, folder):
+    model_path = os.path.join(folder, 'trial_%03i' % trial)
+
+    env = CheckersVecEnv([lambda: CheckersEnv(render_mode=None)])
+    if os.path.exists(model_path + '.zip'):
+        # the config is kept next to the model, a model is only continued with its own config
+        with open(model_path + '.json') as f:
+            if json.load(f) != config:
+                raise ValueError('trial %i in %s was trained with another config' % (trial, folder))
+        model = PPO.load(model_path, env=env, device='cpu')
+    else:
+        with open(model_path + '.json', 'w') as f:
+            json.dump(config, f)
+        model = PPO('MlpPolicy', env=env, device='cpu', verbose=0, seed=trial, **config)
+    if timesteps > model.num_timesteps:
+        model.learn(total_timesteps=timesteps - model.num_timesteps, reset_num_timesteps=False)
+    model.save(model_path)
+    env.close()
+
+    # every trial is scored against the same seeded opponent games
+    eval_env = CheckersVecEnv([lambda: CheckersEnv(render_mode=None)])
+    eval_env.seed(EVAL_SEED)
+    mean_reward, std_reward = evaluate_policy(model, eval_env, n_eval_episodes=EVAL_EPISODES)
+    eval_env.close()
+
+    return trial, model.num_timesteps, float(mean_reward), float(std_reward)
+
+
+def sweep(name='sweep', trials=27, min_timesteps=8192, eta=3, workers=None, seed=0):
+    if min_timesteps % ROLLOUT_MULTIPLE != 0:
+        raise ValueError('min_timesteps must be a multiple of %i, got %i' % (ROLLOUT_MULTIPLE, min_timesteps))
+    folder = os.path.join('sweeps', name)
+    if os.path.exists(folder):
+        raise FileExistsError('sweep %s already exists in %s, pick another --name' % (name, folder))
+    os.makedirs(folder)
+    results_path = os.path.join(folder, 'results.jsonl')
+
+    rng = random.Random(seed)
+    configs = {trial: sample_config(rng) for trial in range(trials)}
+    alive = list(configs)
+
+    rung = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        while True:
+            timesteps = min_timesteps * eta ** rung
+            futures = [pool.submit(run_trial, trial, configs[trial], timesteps, folder) for trial in alive]
+
+            scores = {}
+            with open(results_path, 'a') as results:
+                for future in futures:
+                    trial, trained, mean_reward, std_reward = future.result()
+                    scores[trial] = mean_reward
+                    record = {
+                        'trial': trial,
+                        'rung': rung,
+                        'timesteps': trained,
+                        'config': configs[trial],
+                        'mean_reward': mean_reward,
+                        'std_reward': std_reward,
+                    }
+                    results.write(json.dumps(record) + '\n')
+                    print('Rung: {} Trial: {} Timesteps: {} Reward: {:.1f}'.format(rung, trial, trained, mean_reward))
+
+            if len(alive) <= 1:
+                break
+
+            # successive halving: only the best 1/eta of the trials get the next, eta times larger budget
+            alive = sorted(alive, key=lambda trial: scores[trial], reverse=True)[:max(1, len(alive) // eta)]
+            rung += 1
+
+    best = alive[0]
+    print('Best trial: {} Reward: {:.1f} Config: {}'.format(best, scores[best], configs[best]))
+    return best, configs[best]
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--name', default='sweep')
+    parser.add_argument('--trials', type=int, default=27)
+    parser.add_argument('--min-timesteps', type=int, default=8192)
+    parser.add_argument('--eta', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    sweep(args.name, args.trials, args.min_timesteps, args.eta, args.workers, args.seed)
@@ -0,0 +1,33 @@
+import numpy as np
+
+from env import VEC_STREAM, child_seed
+
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+
+class CheckersVecEnv(DummyVecEnv):
+    def __init__(self, env_fns, seed=None):
+        super().__init__(env_fns)
+        self.rng = np.random.default_rng(child_seed(seed, VEC_STREAM))
+
+    def seed(self, seed=None):
+        self.rng = np.random.default_rng(child_seed(seed, VEC_STREAM))
+        return super().seed(seed)
+
+    def step_wait(self):
+        # the opponent choices of all boards for this step come from a single draw
+        draws = self.rng.random(self.num_envs).tolist()
+        for env, draw in zip(self.envs, draws):
+            env.unwrapped.board.draw = draw
+        return super().step_wait()
+
+    def get_state(self):
+        return {
+            'rng': self.rng.bit_generator.state,
+            'envs': [env.unwrapped.get_state() for env in self.envs],
+        }
+
+    def set_state(self, state):
+        self.rng.bit_generator.state = state['rng']
+        for env, env_state in zip(self.envs, state['envs']):
+            env.unwrapped.set_state(env_state)